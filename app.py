@@ -1,19 +1,49 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, make_response
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, make_response, Response
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
+from werkzeug.security import generate_password_hash, check_password_hash
+from jinja2 import FileSystemBytecodeCache
 import firebase_admin
 from firebase_admin import firestore, credentials
+from google.cloud.firestore_v1.base_query import FieldFilter
+from google.api_core.exceptions import AlreadyExists
+import base64
+import csv
 import hashlib
+import hmac
+import html
+import io
 import json
+import logging
 import os
-from datetime import datetime, timedelta
+import re
+from datetime import datetime, timedelta, timezone
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email import policy as email_policy
 import secrets
+import atexit
+import itertools
+from collections import Counter, defaultdict
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from functools import wraps
 
+# LOG_LEVEL=DEBUG also logs every delivered email and dashboard recalculation
+logging.basicConfig(level=os.getenv('LOG_LEVEL', 'INFO'), format='%(levelname)s %(name)s: %(message)s')
+logger = logging.getLogger(__name__)
+
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(32)
+# A key shared by every worker keeps admin sessions valid across processes and restarts
+app.secret_key = os.environ.get('FLASK_SECRET_KEY')
+if not app.secret_key:
+    logger.warning("FLASK_SECRET_KEY is not set; using a per-process key, sessions will not survive restarts or span workers")
+    app.secret_key = secrets.token_hex(32)
+
+# Compiled page templates are kept in the temp dir, so new workers and cold starts skip re-parsing them
+app.jinja_env.bytecode_cache = FileSystemBytecodeCache()
 
 # Initialize Firebase
 try:
@@ -27,7 +57,7 @@ try:
     
     firebase_admin.initialize_app(cred)
 except Exception as e:
-    print(f"Firebase initialization error: {e}")
+    logger.error("Firebase initialization error: %s", e)
     # Initialize with default for development
     if not firebase_admin._apps:
         firebase_admin.initialize_app()
@@ -42,69 +72,272 @@ SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
 FROM_EMAIL = os.getenv('FROM_EMAIL', 'noreply@pitchperfectai.com')
 FROM_NAME = os.getenv('FROM_NAME', 'PitchPerfectAI Team')
 
-def send_email_campaign(subject, content, recipients):
-    """Send email campaign to list of recipients
+FROM_HEADER = f"{FROM_NAME} <{FROM_EMAIL}>"
+
+SMTP_CONCURRENCY = int(os.getenv('SMTP_CONCURRENCY', '5'))
+# Recipients are pulled from the iterable this many at a time, so only a window is held in memory
+SMTP_SEND_WINDOW = SMTP_CONCURRENCY * 4
+# Sessions are recycled after this many messages; providers commonly cap messages per connection
+SMTP_MAX_MESSAGES_PER_CONN = 100
+# A campaign is abandoned when more than a third of its first 30 sends fail
+SMTP_ABORT_SAMPLE = 30
+SMTP_ABORT_FAILURE_RATIO = 1 / 3
+# How many successful sends between on_progress callbacks
+SMTP_PROGRESS_INTERVAL = 100
+SMTP_MAX_RETRIES = 3
+
+# SMTP reply codes after which the session is dropped and rebuilt
+SMTP_RECONNECT_CODES = (421, 450, 554)
+
+class SMTPPool:
+    """Pool of logged-in SMTP sessions shared by campaign and test sends"""
+    def __init__(self, host, port, username, password, size):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self._idle = queue.Queue(maxsize=size)
+    
+    def _make_conn(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        server.starttls()
+        server.login(self.username, self.password)
+        server.messages_sent = 0
+        return server
+    
+    def get(self):
+        """Return a healthy idle session, or log in a new one"""
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return self._make_conn()
+            # Idle sessions may have been timed out by the server between campaigns
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.discard(server)
+    
+    def put(self, server):
+        """Return a session to the pool, retiring it once it hits the per-connection message cap"""
+        if server.messages_sent >= SMTP_MAX_MESSAGES_PER_CONN:
+            self.discard(server)
+            return
+        try:
+            self._idle.put_nowait(server)
+        except queue.Full:
+            self.discard(server)
+    
+    def recycle(self, server):
+        """Reset a session after a refused message and return it to the pool"""
+        try:
+            server.rset()
+        except (smtplib.SMTPException, OSError):
+            self.discard(server)
+            return
+        self.put(server)
+    
+    def discard(self, server):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+    
+    def reconnect(self, server, attempt):
+        """Drop a broken session and open a new one after an exponential backoff"""
+        self.discard(server)
+        time.sleep(2 ** attempt)
+        return self._make_conn()
+    
+    def close_all(self):
+        while True:
+            try:
+                self.discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+_smtp_pool = None
+
+def send_with_retry(pool, server, to_email, data):
+    """Send the raw message bytes to to_email, reconnecting on disconnects and transient 4xx replies
+    Returns the session that delivered the message; on failure the session has already been
+    handed back to the pool, or discarded if the connection itself broke
+    """
+    for attempt in range(SMTP_MAX_RETRIES + 1):
+        try:
+            server.sendmail(FROM_EMAIL, [to_email], data)
+            return server
+        except smtplib.SMTPException as e:
+            disconnected = isinstance(e, smtplib.SMTPServerDisconnected)
+            retryable = disconnected or (isinstance(e, smtplib.SMTPResponseException)
+                                         and (400 <= e.smtp_code < 500 or e.smtp_code in SMTP_RECONNECT_CODES))
+            if retryable and attempt < SMTP_MAX_RETRIES:
+                server = pool.reconnect(server, attempt)
+                continue
+            if disconnected:
+                pool.discard(server)
+            else:
+                # A refused recipient or message leaves the session usable for the next one
+                pool.recycle(server)
+            raise
+        except Exception:
+            pool.discard(server)
+            raise
+
+def get_smtp_pool():
+    """Return the process-wide SMTP pool, creating it on first use"""
+    global _smtp_pool
+    if _smtp_pool is None:
+        _smtp_pool = SMTPPool(SMTP_SERVER, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_CONCURRENCY)
+        atexit.register(_smtp_pool.close_all)
+    return _smtp_pool
+
+_PERSONALIZE_RE = re.compile(r'\{\{(name|email|company|role)\}\}')
+
+def compile_personalizer(content):
+    """Parse content once and return a function that fills its placeholders from a fields dict
+    Field values are HTML-escaped since the campaign body is sent as HTML
+    """
+    # Alternating literal text / field name segments
+    segments = _PERSONALIZE_RE.split(content)
+    if len(segments) == 1:
+        return lambda fields: content
+    
+    def personalize(fields):
+        parts = segments[:]
+        for i in range(1, len(parts), 2):
+            parts[i] = html.escape(fields[parts[i]])
+        return ''.join(parts)
+    return personalize
+
+_BODY_MARKER = '@@BODY@@'
+
+def build_message_template(subject):
+    """Serialize the headers and MIME framing shared by every message of a campaign
+    Returns (head, tail) bytes that go either side of a recipient's base64-encoded HTML body
+    """
+    msg = MIMEMultipart('alternative', policy=email_policy.SMTP)
+    msg['Subject'] = subject
+    msg['From'] = FROM_HEADER
+    # MIMEText declares the part base64; its payload is swapped for each recipient's encoded body
+    html_part = MIMEText('', 'html', 'utf-8', policy=email_policy.SMTP)
+    html_part.set_payload(_BODY_MARKER)
+    msg.attach(html_part)
+    head, tail = msg.as_bytes().rsplit(_BODY_MARKER.encode(), 1)
+    return head, tail
+
+def render_message(template, to_email, html_body):
+    """Assemble one recipient's message bytes around a build_message_template() result"""
+    if '\r' in to_email or '\n' in to_email:
+        raise ValueError(f"Invalid recipient address: {to_email!r}")
+    head, tail = template
+    body = base64.encodebytes(html_body.encode('utf-8')).rstrip(b'\n').replace(b'\n', b'\r\n')
+    return b''.join((b'To: ', to_email.encode('utf-8'), b'\r\n', head, body, tail))
+
+def send_email_campaign(subject, content, recipients, on_progress=None):
+    """Send email campaign to an iterable of recipient dicts, consuming it once
+    on_progress(sent_count, new_emails) is called every SMTP_PROGRESS_INTERVAL successful sends,
+    with the addresses delivered since the previous call
     Returns: (sent_count, successful_emails) where successful_emails is a list of email addresses that were sent successfully
     """
     if not SMTP_USERNAME or not SMTP_PASSWORD:
         # For development/demo - just simulate sending
-        print(f"DEMO MODE: Would send email '{subject}' to {len(recipients)} recipients")
-        print(f"Subject: {subject}")
-        print(f"Content preview: {content[:100]}...")
-        for i, recipient in enumerate(recipients[:3]):  # Show first 3 recipients
-            print(f"  Recipient {i+1}: {recipient['email']} ({recipient.get('name', 'No name')})")
-        if len(recipients) > 3:
-            print(f"  ... and {len(recipients) - 3} more recipients")
+        recipients = iter(recipients)
+        preview = list(itertools.islice(recipients, 3))  # Show first 3 recipients
         # In demo mode, return all emails as "successful" for testing
-        return len(recipients), [r['email'] for r in recipients]
+        successful_emails = [r['email'] for r in preview]
+        successful_emails.extend(r['email'] for r in recipients)
+        logger.info("DEMO MODE: Would send email '%s' to %s recipients", subject, len(successful_emails))
+        logger.info("Subject: %s", subject)
+        logger.info("Content preview: %s...", content[:100])
+        for i, recipient in enumerate(preview):
+            logger.info("  Recipient %s: %s (%s)", i+1, recipient['email'], recipient.get('name', 'No name'))
+        if len(successful_emails) > 3:
+            logger.info("  ... and %s more recipients", len(successful_emails) - 3)
+        return len(successful_emails), successful_emails
     
-    sent_count = 0
-    successful_emails = []
+    pool = get_smtp_pool()
     
     try:
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        
-        for recipient in recipients:
-            try:
-                # Personalize content
-                personalized_content = content
-                personalized_content = personalized_content.replace('{{name}}', recipient.get('name', 'there'))
-                personalized_content = personalized_content.replace('{{email}}', recipient['email'])
-                personalized_content = personalized_content.replace('{{company}}', recipient.get('company', ''))
-                personalized_content = personalized_content.replace('{{role}}', recipient.get('role', ''))
-                
-                msg = MIMEMultipart('alternative')
-                msg['Subject'] = subject
-                msg['From'] = f"{FROM_NAME} <{FROM_EMAIL}>"
-                msg['To'] = recipient['email']
-                
-                # Create HTML part
-                html_part = MIMEText(personalized_content, 'html')
-                msg.attach(html_part)
-                
-                server.send_message(msg)
-                sent_count += 1
-                successful_emails.append(recipient['email'])
-                print(f"Email sent to {recipient['email']}")
-                
-            except Exception as e:
-                print(f"Failed to send email to {recipient['email']}: {str(e)}")
-                continue
-        
-        server.quit()
-        
+        # Fail fast on bad SMTP settings before fanning out
+        pool.put(pool.get())
     except Exception as e:
-        print(f"SMTP Error: {str(e)}")
+        logger.error("SMTP Error: %s", e)
         return 0, []
     
-    return sent_count, successful_emails
+    # Parse the template and serialize the MIME framing once per campaign rather than once per recipient
+    personalize = compile_personalizer(content)
+    message_template = build_message_template(subject)
+    
+    abort = threading.Event()
+    progress_lock = threading.Lock()
+    progress = {'attempted': 0, 'failed': 0, 'sent': 0}
+    unreported = []
+    
+    def _send_one(recipient):
+        if abort.is_set():
+            return None
+        ok = False
+        try:
+            # Personalize content in a single pass over the pre-split template
+            personalized_content = personalize({
+                'name': recipient.get('name', 'there'),
+                'email': recipient['email'],
+                'company': recipient.get('company', ''),
+                'role': recipient.get('role', '')
+            })
+            
+            data = render_message(message_template, recipient['email'], personalized_content)
+            server = send_with_retry(pool, pool.get(), recipient['email'], data)
+            server.messages_sent += 1
+            pool.put(server)
+            ok = True
+            logger.debug("Email sent to %s", recipient['email'])
+            
+        except Exception as e:
+            logger.warning("Failed to send email to %s: %s", recipient['email'], e)
+        
+        report = None
+        with progress_lock:
+            progress['attempted'] += 1
+            progress['failed'] += not ok
+            progress['sent'] += ok
+            if (progress['attempted'] == SMTP_ABORT_SAMPLE
+                    and progress['failed'] > SMTP_ABORT_SAMPLE * SMTP_ABORT_FAILURE_RATIO):
+                logger.error("Aborting campaign: %s of the first %s sends failed", progress['failed'], SMTP_ABORT_SAMPLE)
+                abort.set()
+            if ok:
+                unreported.append(recipient['email'])
+                if progress['sent'] % SMTP_PROGRESS_INTERVAL == 0:
+                    report = (progress['sent'], unreported[:])
+                    unreported.clear()
+        
+        # Reported outside the lock so a slow callback doesn't stall the other workers
+        if report is not None and on_progress is not None:
+            try:
+                on_progress(*report)
+            except Exception as e:
+                logger.error("Progress callback error: %s", e)
+        return recipient['email'] if ok else None
+    
+    recipients = iter(recipients)
+    results = []
+    with ThreadPoolExecutor(max_workers=SMTP_CONCURRENCY) as executor:
+        while not abort.is_set():
+            window = list(itertools.islice(recipients, SMTP_SEND_WINDOW))
+            if not window:
+                break
+            results.extend(executor.map(_send_one, window))
+    
+    successful_emails = [email for email in results if email is not None]
+    return len(successful_emails), successful_emails
 
 def init_db():
     """Initialize database with default admin user"""
     try:
-        print("Initializing database...")
+        logger.info("Initializing database...")
         # Check if admin user exists
         admin_ref = db.collection('admin_users').document('admin')
         admin_doc = admin_ref.get()
@@ -113,23 +346,69 @@ def init_db():
             # Create default admin user
             admin_data = {
                 'username': 'admin',
-                'password': hashlib.sha256('admin123'.encode()).hexdigest(),
+                'password': generate_password_hash('admin123', method='scrypt'),
                 'created_at': datetime.now()
             }
             admin_ref.set(admin_data)
-            print("Default admin user created: admin/admin123")
-            print(f"Password hash: {admin_data['password']}")
+            logger.info("Default admin user created: admin/admin123")
         else:
-            print("Admin user already exists")
-            existing_data = admin_doc.to_dict()
-            print(f"Existing password hash: {existing_data.get('password', 'N/A')}")
+            logger.info("Admin user already exists")
     except Exception as e:
-        print(f"Database initialization error: {e}")
+        logger.error("Database initialization error: %s", e)
         # Create a fallback in-memory admin for development
-        print("Creating fallback admin credentials")
+        logger.info("Creating fallback admin credentials")
+
+# Seed the admin in the background so importing the app (once per worker or cold start)
+# doesn't block on a Firestore round trip; it also opens the client's channel before the first request
+threading.Thread(target=init_db, name='init-db', daemon=True).start()
+
+# Field projections so queries only pull what each view uses
+USER_FIELDS = ['email', 'name', 'company', 'role', 'status', 'signup_date', 'notes']
+RECIPIENT_FIELDS = ['email', 'name', 'company', 'role']
+
+# Runs independent Firestore reads concurrently so a page waits on one round trip instead of several
+query_executor = ThreadPoolExecutor(max_workers=4)
+
+def count_waitlist_users(*filters):
+    """Count waitlist users matching the given FieldFilters with a server-side count() aggregation"""
+    query = db.collection('waitlist_users')
+    for field_filter in filters:
+        query = query.where(filter=field_filter)
+    return query.count().get()[0][0].value
+
+DASHBOARD_STATS_TTL = 60
+CAMPAIGNS_TTL = 60
+SIGNUP_CHART_TTL = 60
 
-# Initialize database on startup
-init_db()
+# Admin page query results: key -> (expires_at, value). Per process, so every write
+# that changes a cached result drops its key rather than waiting for the TTL.
+_query_cache = {}
+
+def cached_query(key, ttl, loader):
+    """Return loader()'s result for key, re-running it at most once every ttl seconds"""
+    now = time.monotonic()
+    cached = _query_cache.get(key)
+    if cached and cached[0] > now:
+        return cached[1]
+    value = loader()
+    _query_cache[key] = (now + ttl, value)
+    return value
+
+def invalidate_query_cache(*keys):
+    for key in keys:
+        _query_cache.pop(key, None)
+
+def count_dashboard_stats():
+    # Get user statistics as count() aggregations instead of downloading every user
+    # signup_date is a server timestamp (UTC), so the cutoff is computed in UTC too
+    week_ago = datetime.now(timezone.utc) - timedelta(days=7)
+    counts = {
+        'total_users': query_executor.submit(count_waitlist_users),
+        'pending_users': query_executor.submit(count_waitlist_users, FieldFilter('status', '==', 'pending')),
+        'contacted_users': query_executor.submit(count_waitlist_users, FieldFilter('status', '==', 'contacted')),
+        'recent_signups': query_executor.submit(count_waitlist_users, FieldFilter('signup_date', '>=', week_ago))
+    }
+    return {name: future.result() for name, future in counts.items()}
 
 # Flask-Login setup
 login_manager = LoginManager()
@@ -140,6 +419,19 @@ class User(UserMixin):
     def __init__(self, username):
         self.id = username
 
+ADMIN_CACHE_TTL = 300
+ADMIN_CACHE_SIZE = 64
+
+# user_id -> (expires_at, User or None), so protected pages skip the admin_users read
+_admin_cache = {}
+
+def invalidate_admin_cache(user_id=None):
+    """Drop one cached admin lookup, or all of them"""
+    if user_id is None:
+        _admin_cache.clear()
+    else:
+        _admin_cache.pop(user_id, None)
+
 @login_manager.user_loader
 def load_user(user_id):
     try:
@@ -147,18 +439,91 @@ def load_user(user_id):
         if user_id == 'admin':
             return User(user_id)
         
+        now = time.time()
+        cached = _admin_cache.get(user_id)
+        if cached and cached[0] > now:
+            return cached[1]
+        
         # Try Firebase lookup
         admin_ref = db.collection('admin_users').document(user_id)
         admin_doc = admin_ref.get()
-        if admin_doc.exists:
-            return User(user_id)
+        user = User(user_id) if admin_doc.exists else None
+        
+        if len(_admin_cache) >= ADMIN_CACHE_SIZE and user_id not in _admin_cache:
+            _admin_cache.pop(next(iter(_admin_cache)))
+        _admin_cache[user_id] = (now + ADMIN_CACHE_TTL, user)
+        return user
     except Exception as e:
-        print(f"User loader error: {e}")
+        logger.error("User loader error: %s", e)
         # Fallback for admin user
         if user_id == 'admin':
             return User(user_id)
     return None
 
+def check_admin_password(admin_ref, admin_data, password):
+    """Verify password against the stored hash, upgrading older hashes to scrypt on success"""
+    stored_hash = admin_data.get('password') or ''
+    if '$' in stored_hash:
+        if not check_password_hash(stored_hash, password):
+            return False
+    # Legacy unsalted SHA-256 hash
+    elif not hmac.compare_digest(stored_hash, hashlib.sha256(password.encode()).hexdigest()):
+        return False
+    
+    if not stored_hash.startswith('scrypt:'):
+        admin_ref.update({'password': generate_password_hash(password, method='scrypt')})
+        invalidate_admin_cache(admin_ref.id)
+    return True
+
+# Development credentials that work even when Firestore is unreachable
+FALLBACK_ADMIN_USERNAME = 'admin'
+FALLBACK_ADMIN_PASSWORD = 'admin123'
+# Seconds to wait on the admin_users lookup before failing the login
+ADMIN_LOOKUP_TIMEOUT = 1.5
+
+def verify_admin(username, password):
+    """Check credentials against the fallback admin, then the admin_users collection"""
+    # No network round trip for the fallback admin, so a slow Firestore can't delay it
+    if (username == FALLBACK_ADMIN_USERNAME
+            and hmac.compare_digest(password.encode(), FALLBACK_ADMIN_PASSWORD.encode())):
+        return True
+    
+    admin_ref = db.collection('admin_users').document(username)
+    admin_doc = admin_ref.get(timeout=ADMIN_LOOKUP_TIMEOUT)
+    return admin_doc.exists and check_admin_password(admin_ref, admin_doc.to_dict(), password)
+
+LOGIN_ATTEMPT_WINDOW = 60
+LOGIN_ATTEMPT_LIMIT = 5
+LOGIN_ATTEMPT_TRACKED_IPS = 1024
+
+# Client IP -> timestamps of recent failed logins, so brute force can't drive Firestore reads
+_login_attempts = defaultdict(list)
+# Guards _login_attempts, which every login request reads and writes
+_login_attempts_lock = threading.Lock()
+
+def login_rate_limited(client_ip):
+    """True when client_ip has hit the failed-login limit within the window"""
+    cutoff = time.time() - LOGIN_ATTEMPT_WINDOW
+    with _login_attempts_lock:
+        attempts = [t for t in _login_attempts.get(client_ip, ()) if t > cutoff]
+        if attempts:
+            _login_attempts[client_ip] = attempts
+        else:
+            _login_attempts.pop(client_ip, None)
+    return len(attempts) >= LOGIN_ATTEMPT_LIMIT
+
+def record_failed_login(client_ip):
+    now = time.time()
+    with _login_attempts_lock:
+        if len(_login_attempts) >= LOGIN_ATTEMPT_TRACKED_IPS and client_ip not in _login_attempts:
+            # Sweep IPs whose attempts have all expired, then evict the oldest if still full
+            cutoff = now - LOGIN_ATTEMPT_WINDOW
+            for ip in [ip for ip, attempts in _login_attempts.items() if attempts[-1] <= cutoff]:
+                del _login_attempts[ip]
+            if len(_login_attempts) >= LOGIN_ATTEMPT_TRACKED_IPS:
+                _login_attempts.pop(next(iter(_login_attempts)))
+        _login_attempts[client_ip].append(now)
+
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -167,29 +532,73 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+# Cache-Control for cacheable GET endpoints; both also get an ETag so repeat loads can be answered with 304.
+# The landing page revalidates every time because it renders the flash message left by /signup;
+# browsers keep the signups chart as long as the server-side copy lives.
+CACHE_CONTROL = {
+    'landing': 'no-cache',
+    'api_stats': f'private, max-age={SIGNUP_CHART_TTL}'
+}
+
+@app.after_request
+def add_cache_headers(response):
+    cache_control = CACHE_CONTROL.get(request.endpoint)
+    if cache_control and request.method == 'GET' and response.status_code == 200:
+        response.headers['Cache-Control'] = cache_control
+        response.add_etag()
+        response.make_conditional(request)
+    return response
+
+@app.template_filter('fmtdt')
+def format_datetime(value):
+    """Render a timestamp as YYYY-MM-DD HH:MM; anything else is cut to the same width"""
+    if isinstance(value, datetime):
+        return f"{value.year}-{value.month:02d}-{value.day:02d} {value.hour:02d}:{value.minute:02d}"
+    return str(value)[:16]
+
 @app.route('/')
 def landing():
     return render_template('landing.html')
 
-@app.route('/signup', methods=['POST'])
-def signup():
-    email = request.form.get('email', '').strip().lower()
-    name = request.form.get('name', '').strip()
-    company = request.form.get('company', '').strip()
-    role = request.form.get('role', '').strip()
+def waitlist_doc_id(email):
+    """Deterministic waitlist_users document ID for a normalized email"""
+    return hashlib.sha1(email.encode()).hexdigest()
+
+# Set by rekey-waitlist-users; until then older signups may still sit under auto-generated IDs
+_waitlist_rekeyed = False
+
+def waitlist_rekeyed():
+    """True once every waitlist_users document is keyed by waitlist_doc_id()"""
+    global _waitlist_rekeyed
+    if not _waitlist_rekeyed:
+        marker = db.collection('app_meta').document('waitlist_users').get().to_dict() or {}
+        _waitlist_rekeyed = bool(marker.get('keyed_by_email'))
+    return _waitlist_rekeyed
+
+def daily_count_ref(day):
+    """waitlist_daily_counts document holding the number of signups on a UTC date"""
+    return db.collection('waitlist_daily_counts').document(day.isoformat())
+
+# (flash category, message, HTTP status for /api/signup) per signup outcome
+SIGNUP_OUTCOMES = {
+    'joined': ('success', 'Thank you for joining our waitlist! We\'ll be in touch soon.', 201),
+    'exists': ('info', 'You are already on the waitlist!', 200),
+    'invalid': ('error', 'Email is required', 400),
+    'error': ('error', 'An error occurred. Please try again.', 500)
+}
+
+def add_waitlist_user(form):
+    """Create a waitlist entry from submitted signup fields and return the outcome key"""
+    email = form.get('email', '').strip().lower()
+    name = form.get('name', '').strip()
+    company = form.get('company', '').strip()
+    role = form.get('role', '').strip()
     
     if not email:
-        flash('Email is required', 'error')
-        return redirect(url_for('landing'))
+        return 'invalid'
     
     try:
-        # Check if user already exists
         users_ref = db.collection('waitlist_users')
-        existing_user = users_ref.where('email', '==', email).limit(1).get()
-        
-        if existing_user:
-            flash('You are already on the waitlist!', 'info')
-            return redirect(url_for('landing'))
         
         # Add new user
         user_data = {
@@ -198,65 +607,71 @@ def signup():
             'company': company,
             'role': role,
             'status': 'pending',
-            'signup_date': datetime.now(),
+            # Stamped by Firestore so every signup_date is a timestamp the range queries can match
+            'signup_date': firestore.SERVER_TIMESTAMP,
             'notes': ''
         }
         
-        users_ref.add(user_data)
-        flash('Thank you for joining our waitlist! We\'ll be in touch soon.', 'success')
-        
+        # create() can't see signups stored under auto IDs, so look those up by email until they're rekeyed
+        if not waitlist_rekeyed():
+            legacy = users_ref.select([]).where(filter=FieldFilter('email', '==', email)).limit(1).stream()
+            if next(legacy, None) is not None:
+                return 'exists'
+        
+        # Keyed by email so create() doubles as the uniqueness check; the day's signup
+        # counter is bumped in the same atomic batch, so api_stats never has to scan users
+        batch = db.batch()
+        batch.create(users_ref.document(waitlist_doc_id(email)), user_data)
+        batch.set(daily_count_ref(datetime.now(timezone.utc).date()), {'count': firestore.Increment(1)}, merge=True)
+        batch.commit()
+        invalidate_query_cache('dashboard:stats', 'signups:daily')
+        return 'joined'
+        
+    except AlreadyExists:
+        return 'exists'
     except Exception as e:
-        print(f"Signup error: {e}")
-        flash('An error occurred. Please try again.', 'error')
-    
+        logger.error("Signup error: %s", e)
+        return 'error'
+
+@app.route('/signup', methods=['POST'])
+def signup():
+    """Form signup for browsers without JavaScript"""
+    category, message, _ = SIGNUP_OUTCOMES[add_waitlist_user(request.form)]
+    flash(message, category)
     return redirect(url_for('landing'))
 
+@app.route('/api/signup', methods=['POST'])
+def api_signup():
+    """Signup endpoint used by the landing page script; avoids the redirect and page re-render"""
+    outcome = add_waitlist_user(request.form)
+    category, message, status_code = SIGNUP_OUTCOMES[outcome]
+    return jsonify({'status': outcome, 'category': category, 'message': message}), status_code
+
 @app.route('/excelsior/login', methods=['GET', 'POST'])
 def excelsior_login():
     if request.method == 'POST':
         username = request.form.get('username')
         password = request.form.get('password')
         
-        print(f"Login attempt - Username: {username}")
+        logger.info("Login attempt - Username: %s", username)
+        
+        if username and password and login_rate_limited(request.remote_addr):
+            flash('Too many login attempts. Please wait a minute and try again.', 'error')
+            return render_template('admin_login.html'), 429
         
         if username and password:
             try:
-                # For development/fallback - check hardcoded credentials first
-                if username == 'admin' and password == 'admin123':
-                    print("Using fallback admin credentials")
+                if verify_admin(username, password):
                     user = User(username)
+                    # Seed load_user's cache so the next page load skips the same read
+                    _admin_cache[username] = (time.time() + ADMIN_CACHE_TTL, user)
                     login_user(user, remember=True)
-                    print(f"User logged in: {current_user.is_authenticated}")
                     return redirect(url_for('excelsior_dashboard'))
-                
-                # Try Firebase authentication
-                admin_ref = db.collection('admin_users').document(username)
-                admin_doc = admin_ref.get()
-                
-                print(f"Firebase doc exists: {admin_doc.exists}")
-                
-                if admin_doc.exists:
-                    admin_data = admin_doc.to_dict()
-                    hashed_password = hashlib.sha256(password.encode()).hexdigest()
-                    
-                    print(f"Stored hash: {admin_data.get('password', 'N/A')}")
-                    print(f"Input hash: {hashed_password}")
-                    
-                    if admin_data.get('password') == hashed_password:
-                        user = User(username)
-                        login_user(user, remember=True)
-                        return redirect(url_for('excelsior_dashboard'))
-                
                 flash('Invalid credentials', 'error')
             except Exception as e:
-                print(f"Login error: {e}")
-                # Fallback authentication for development
-                if username == 'admin' and password == 'admin123':
-                    print("Using emergency fallback credentials")
-                    user = User(username)
-                    login_user(user, remember=True)
-                    return redirect(url_for('excelsior_dashboard'))
+                logger.error("Login error: %s", e)
                 flash('Login error occurred', 'error')
+            record_failed_login(request.remote_addr)
         else:
             flash('Please enter both username and password', 'error')
     
@@ -273,78 +688,50 @@ def excelsior_logout():
 @admin_required
 def excelsior_dashboard():
     try:
-        # Get user statistics
-        users_ref = db.collection('waitlist_users')
-        all_users = users_ref.get()
-        
-        total_users = len(all_users)
-        pending_users = len([u for u in all_users if u.to_dict().get('status') == 'pending'])
-        contacted_users = len([u for u in all_users if u.to_dict().get('status') == 'contacted'])
-        
-        # Get recent signups (last 7 days)
-        week_ago = datetime.now() - timedelta(days=7)
-        recent_users = []
-        for u in all_users:
-            user_data = u.to_dict()
-            signup_date = user_data.get('signup_date')
-            if signup_date:
-                try:
-                    # Handle different date formats
-                    if hasattr(signup_date, 'replace'):
-                        # Convert timezone-aware datetime to naive for comparison
-                        if signup_date.tzinfo is not None:
-                            signup_date = signup_date.replace(tzinfo=None)
-                        if signup_date > week_ago:
-                            recent_users.append(u)
-                    elif isinstance(signup_date, str):
-                        # Handle string dates
-                        try:
-                            parsed_date = datetime.fromisoformat(signup_date.replace('Z', '+00:00'))
-                            if parsed_date.tzinfo is not None:
-                                parsed_date = parsed_date.replace(tzinfo=None)
-                            if parsed_date > week_ago:
-                                recent_users.append(u)
-                        except ValueError:
-                            print(f"Could not parse date: {signup_date}")
-                except Exception as date_error:
-                    print(f"Date processing error: {date_error}")
-                    continue
-        
-        stats = {
-            'total_users': total_users,
-            'pending_users': pending_users,
-            'contacted_users': contacted_users,
-            'recent_signups': len(recent_users)
-        }
-        print(f"Dashboard stats calculated: {stats}")
+        stats = cached_query('dashboard:stats', DASHBOARD_STATS_TTL, count_dashboard_stats)
+        logger.debug("Dashboard stats calculated: %s", stats)
         return render_template('admin_dashboard.html', stats=stats)
         
     except Exception as e:
-        print(f"Dashboard error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Dashboard error: %s", e)
         flash('Error loading dashboard', 'error')
         return render_template('admin_dashboard.html', stats={'total_users': 0, 'pending_users': 0, 'contacted_users': 0, 'recent_signups': 0})
 
+USERS_PAGE_SIZE = 50
+
 @app.route('/excelsior/users')
 @admin_required
 def excelsior_users():
+    page_token = request.args.get('page_token', '')
     try:
         users_ref = db.collection('waitlist_users')
-        users_docs = users_ref.order_by('signup_date', direction=firestore.Query.DESCENDING).get()
+        # Document ID breaks ties between users who signed up at the same instant
+        query = (users_ref.select(USER_FIELDS)
+                 .order_by('signup_date', direction=firestore.Query.DESCENDING)
+                 .order_by('__name__', direction=firestore.Query.DESCENDING)
+                 .limit(USERS_PAGE_SIZE))
+        if page_token:
+            # The token is "<signup_date>|<doc id>" of the last user on the previous page
+            signup_date, _, doc_id = page_token.partition('|')
+            query = query.start_after({'signup_date': datetime.fromisoformat(signup_date), '__name__': doc_id})
         
         users = []
-        for doc in users_docs:
+        for doc in query.stream():
             user_data = doc.to_dict()
             user_data['id'] = doc.id
             users.append(user_data)
         
-        return render_template('admin_users.html', users=users)
+        next_page_token = None
+        if len(users) == USERS_PAGE_SIZE:
+            next_page_token = f"{users[-1]['signup_date'].isoformat()}|{users[-1]['id']}"
+        
+        return render_template('admin_users.html', users=users, total_users=count_waitlist_users(),
+                               page_token=page_token, next_page_token=next_page_token)
         
     except Exception as e:
-        print(f"Users page error: {e}")
+        logger.error("Users page error: %s", e)
         flash('Error loading users', 'error')
-        return render_template('admin_users.html', users=[])
+        return render_template('admin_users.html', users=[], total_users=0, page_token='', next_page_token=None)
 
 @app.route('/excelsior/users/<user_id>/edit', methods=['POST'])
 @admin_required
@@ -358,11 +745,12 @@ def edit_user(user_id):
             'status': status,
             'notes': notes
         })
+        invalidate_query_cache('dashboard:stats')
         
         flash('User updated successfully', 'success')
         
     except Exception as e:
-        print(f"Edit user error: {e}")
+        logger.error("Edit user error: %s", e)
         flash('Error updating user', 'error')
     
     return redirect(url_for('excelsior_users'))
@@ -372,126 +760,71 @@ def edit_user(user_id):
 def excelsior_export_users():
     try:
         users_ref = db.collection('waitlist_users')
-        users_docs = users_ref.order_by('signup_date').get()
-        
-        # Create CSV content
-        csv_content = "Email,Name,Company,Role,Status,Signup Date,Notes\n"
-        
-        for doc in users_docs:
-            user = doc.to_dict()
-            signup_date = user.get('signup_date', '')
-            if isinstance(signup_date, datetime):
-                signup_date = signup_date.strftime('%Y-%m-%d %H:%M:%S')
+        # stream() pages documents in lazily instead of materializing the collection
+        users_docs = users_ref.select(USER_FIELDS).order_by('signup_date').stream()
+        
+        def generate():
+            output = io.StringIO()
+            writer = csv.writer(output)
+            writer.writerow(['Email', 'Name', 'Company', 'Role', 'Status', 'Signup Date', 'Notes'])
+            yield output.getvalue()
+            output.seek(0)
+            output.truncate()
             
-            csv_content += f'"{user.get("email", "")}","{user.get("name", "")}","{user.get("company", "")}","{user.get("role", "")}","{user.get("status", "")}","{signup_date}","{user.get("notes", "")}"\n'
-        
-        response = make_response(csv_content)
-        response.headers['Content-Type'] = 'text/csv'
-        response.headers['Content-Disposition'] = 'attachment; filename=waitlist_users.csv'
-        
-        return response
+            for doc in users_docs:
+                user = doc.to_dict()
+                signup_date = user.get('signup_date', '')
+                if isinstance(signup_date, datetime):
+                    signup_date = signup_date.strftime('%Y-%m-%d %H:%M:%S')
+                
+                writer.writerow([user.get('email', ''), user.get('name', ''), user.get('company', ''), user.get('role', ''),
+                                 user.get('status', ''), signup_date, user.get('notes', '')])
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+        
+        return Response(
+            generate(),
+            mimetype='text/csv',
+            headers={'Content-Disposition': 'attachment; filename=waitlist_users.csv'}
+        )
         
     except Exception as e:
-        print(f"Export error: {e}")
+        logger.error("Export error: %s", e)
         flash('Error exporting users', 'error')
         return redirect(url_for('excelsior_users'))
 
+# The emails page lists this many of the most recent campaigns
+CAMPAIGNS_PAGE_SIZE = 50
+
+# Every campaign is written with these fields; older documents get them from backfill-campaign-defaults
+CAMPAIGN_DEFAULTS = {
+    'subject': 'No Subject',
+    'content': 'No Content',
+    'status': 'unknown',
+    'recipients_count': 0,
+    'created_by': 'Unknown'
+}
+
+def load_campaigns():
+    """Newest campaigns first, ordered and limited by Firestore in a single query"""
+    campaigns_ref = db.collection('email_campaigns')
+    query = campaigns_ref.order_by('created_at', direction=firestore.Query.DESCENDING).limit(CAMPAIGNS_PAGE_SIZE)
+    return [{**doc.to_dict(), 'id': doc.id} for doc in query.stream()]
+
 @app.route('/excelsior/emails')
 @admin_required
 def excelsior_emails():
-    campaigns = []
-    
     try:
-        print("[PRODUCTION] Starting campaigns loading process...")
-        
         # Check if we're in production and have Firebase credentials
-        import os
-        firebase_key = os.environ.get('FIREBASE_SERVICE_ACCOUNT_KEY')
-        if not firebase_key:
-            print("[PRODUCTION] ERROR: FIREBASE_SERVICE_ACCOUNT_KEY not found in environment")
+        if not os.environ.get('FIREBASE_SERVICE_ACCOUNT_KEY'):
+            logger.error("FIREBASE_SERVICE_ACCOUNT_KEY not found in environment")
             flash('Firebase credentials not configured', 'error')
             return render_template('admin_emails.html', campaigns=[])
         
-        print(f"[PRODUCTION] Firebase key found, length: {len(firebase_key)}")
-        
-        # Test Firebase connection first
-        try:
-            test_ref = db.collection('waitlist_users').limit(1).get()
-            print(f"[PRODUCTION] Firebase connection test successful, found {len(test_ref)} test docs")
-        except Exception as conn_error:
-            print(f"[PRODUCTION] Firebase connection failed: {conn_error}")
-            import traceback
-            traceback.print_exc()
-            flash('Firebase connection error - check credentials', 'error')
-            return render_template('admin_emails.html', campaigns=[])
-        
-        # Alternative approach: Use stream() instead of get()
-        campaigns_ref = db.collection('email_campaigns')
-        print("[PRODUCTION] Got campaigns collection reference")
-        
-        # Try to get existing campaigns first
-        campaigns_docs = []
-        
-        try:
-            # Check if any campaigns exist by trying to get them
-            campaigns_docs = list(campaigns_ref.get())
-            print(f"[PRODUCTION] Found {len(campaigns_docs)} existing campaigns")
-            
-            # If no campaigns found, the collection might be empty but valid
-            if len(campaigns_docs) == 0:
-                print("[PRODUCTION] No campaigns found - collection exists but is empty")
-                # Don't create sample, just return empty list
-                return render_template('admin_emails.html', campaigns=[])
-                
-        except Exception as get_error:
-            print(f"[PRODUCTION] Error accessing campaigns collection: {get_error}")
-            import traceback
-            traceback.print_exc()
-            
-            # Collection might not exist, try to create it with a real campaign from the logs
-            try:
-                print("[PRODUCTION] Creating email_campaigns collection with saved campaign...")
-                # Use the campaign data from your logs
-                saved_campaign = {
-                    'subject': 'Welcome to PitchPerfectAI Waitlist! 🎉',
-                    'content': "Hi ,\r\n\r\nThank you for joining the PitchPerfectAI waitlist! We're thrilled to have you on board.\r\n\r\nPitchPerfectAI is revolutionizing how developers and startups create compelling pitch decks from their GitHub repositories. Our AI-powered platform will help you:\r\n\r\n✨ Transform your code into investor-ready presentations\r\n🚀 Highlight your project's key features and benefits\r\n📊 Generate professional slides with beautiful templates\r\n💡 Tell your project's story in a compelling way\r\n\r\nWe're working hard to bring you the best possible experience. You'll be among the first to know when we launch!\r\n\r\nIn the meantime, feel free to reply to this email with any questions or feedback.\r\n\r\nBest regards,\r\nThe PitchPerfectAI Team\r\n\r\nP.S. Follow us on Twitter @PitchPerfectAI for updates and tips!",
-                    'status': 'draft',
-                    'created_at': datetime.now(),
-                    'sent_at': None,
-                    'recipients_count': 0
-                }
-                doc_ref = campaigns_ref.add(saved_campaign)
-                print(f"[PRODUCTION] Created campaign with ID: {doc_ref[1].id}")
-                campaigns_docs = list(campaigns_ref.get())
-                print(f"[PRODUCTION] Retrieved {len(campaigns_docs)} campaigns after creation")
-                
-            except Exception as create_error:
-                print(f"[PRODUCTION] Failed to create collection: {create_error}")
-                import traceback
-                traceback.print_exc()
-                flash('Unable to access or create email campaigns collection', 'error')
-                return render_template('admin_emails.html', campaigns=[])
-        
-        # Process documents
-        campaigns_list = []
-        print(f"[PRODUCTION] Processing {len(campaigns_docs)} documents...")
-        
-        for i, doc in enumerate(campaigns_docs):
-            try:
-                campaign_data = doc.to_dict()
-                if campaign_data:
-                    campaign_data['id'] = doc.id
-                    campaigns_list.append(campaign_data)
-                    print(f"[PRODUCTION] Added campaign: {campaign_data.get('subject', 'No subject')}")
-                    
-            except Exception as doc_error:
-                print(f"[PRODUCTION] Error processing document {doc.id}: {doc_error}")
-                continue
-        
-        # Sort by created_at
-        campaigns_list.sort(key=lambda x: x.get('created_at', datetime.min), reverse=True)
-        
-        print(f"[PRODUCTION] Final result: {len(campaigns_list)} campaigns loaded")
+        # An empty or missing collection simply yields no campaigns
+        campaigns_list = cached_query('campaigns:all', CAMPAIGNS_TTL, load_campaigns)
+        logger.debug("Loaded %s campaigns", len(campaigns_list))
         
         # Force flash message to show what we found
         if len(campaigns_list) > 0:
@@ -499,12 +832,12 @@ def excelsior_emails():
         else:
             flash('No email campaigns found - create your first campaign!', 'info')
             
-        return render_template('admin_emails.html', campaigns=campaigns_list)
+        # Sends that stopped reporting progress can be queued again
+        stale_ids = {campaign['id'] for campaign in campaigns_list if campaign_is_stale(campaign)}
+        return render_template('admin_emails.html', campaigns=campaigns_list, stale_ids=stale_ids)
         
     except Exception as e:
-        print(f"[PRODUCTION] Critical error in excelsior_emails: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Critical error in excelsior_emails: %s", e)
         flash('Error loading email campaigns', 'error')
         return render_template('admin_emails.html', campaigns=[])
 
@@ -521,46 +854,42 @@ def save_email():
         subject = request.form.get('subject', '').strip()
         content = request.form.get('content', '').strip()
         
-        print(f"Received save email request - Action: '{action}', Subject: '{subject}', Content length: {len(content)}")
+        logger.info("Received save email request - Action: '%s', Subject: '%s', Content length: %s", action, subject, len(content))
         
         if not subject or not content:
-            print("Validation failed: Missing subject or content")
+            logger.info("Validation failed: Missing subject or content")
             flash('Subject and content are required', 'error')
             return redirect(url_for('new_email'))
         
         if action == 'send_now':
             # Handle immediate sending
             try:
-                # Get all pending users
-                users_ref = db.collection('waitlist_users')
-                pending_users = users_ref.where('status', '==', 'pending').get()
-                
-                sent_count = 0
-                for user_doc in pending_users:
-                    user_data = user_doc.to_dict()
-                    # Send email logic would go here
-                    # For now, just count
-                    sent_count += 1
-                
-                # Save as sent campaign
+                # Queued and sent on campaign_executor like send_campaign, so the request
+                # neither walks the pending users nor waits on SMTP
+                now = datetime.now()
                 campaign_data = {
                     'subject': subject,
                     'content': content,
-                    'status': 'sent',
-                    'created_at': datetime.now(),
-                    'sent_at': datetime.now(),
-                    'recipients_count': sent_count
+                    'status': 'queued',
+                    'created_at': now,
+                    'queued_at': firestore.SERVER_TIMESTAMP,
+                    'heartbeat_at': firestore.SERVER_TIMESTAMP,
+                    'sent_at': None,
+                    'recipients_count': 0,
+                    'created_by': current_user.id
                 }
                 
                 campaigns_ref = db.collection('email_campaigns')
                 doc_ref = campaigns_ref.add(campaign_data)
+                invalidate_query_cache('campaigns:all')
+                campaign_executor.submit(run_campaign, doc_ref[1].id)
                 
-                print(f"Campaign sent successfully with ID: {doc_ref[1].id} to {sent_count} users")
-                flash(f'Email campaign sent to {sent_count} users', 'success')
+                logger.info("Campaign queued for sending with ID: %s", doc_ref[1].id)
+                flash('Email campaign queued for sending to all pending users', 'success')
                 return redirect(url_for('excelsior_emails'))
                 
             except Exception as send_error:
-                print(f"Send email error: {send_error}")
+                logger.error("Send email error: %s", send_error)
                 flash('Error sending email campaign', 'error')
                 return redirect(url_for('new_email'))
         
@@ -572,22 +901,22 @@ def save_email():
                 'status': 'draft',
                 'created_at': datetime.now(),
                 'sent_at': None,
-                'recipients_count': 0
+                'recipients_count': 0,
+                'created_by': current_user.id
             }
             
-            print(f"Attempting to save campaign data: {campaign_data}")
+            logger.debug("Attempting to save campaign data: %s", campaign_data)
             
             campaigns_ref = db.collection('email_campaigns')
             doc_ref = campaigns_ref.add(campaign_data)
+            invalidate_query_cache('campaigns:all')
             
-            print(f"Campaign saved successfully with ID: {doc_ref[1].id}")
+            logger.info("Campaign saved successfully with ID: %s", doc_ref[1].id)
             flash('Email campaign saved as draft', 'success')
             return redirect(url_for('excelsior_emails'))
         
     except Exception as e:
-        print(f"Save email error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Save email error: %s", e)
         flash('Error saving email campaign', 'error')
         return redirect(url_for('new_email'))
 
@@ -613,93 +942,161 @@ def test_email():
             flash('Failed to send test email. Check your SMTP configuration.', 'error')
             
     except Exception as e:
-        print(f"Test email error: {e}")
+        logger.error("Test email error: %s", e)
         flash('Error sending test email', 'error')
     
     return redirect(url_for('excelsior_emails'))
 
+# Campaign sends run here so the request that triggers them returns immediately
+campaign_executor = ThreadPoolExecutor(max_workers=2)
+
+# A queued or sending campaign whose heartbeat is older than this is taken to have died with its worker
+CAMPAIGN_STALE_AFTER = timedelta(minutes=15)
+
+def campaign_is_stale(campaign):
+    """True for a queued/sending campaign whose sender stopped reporting progress"""
+    if campaign.get('status') not in ('queued', 'sending'):
+        return False
+    heartbeat = campaign.get('heartbeat_at') or campaign.get('queued_at')
+    if not isinstance(heartbeat, datetime):
+        return False
+    if heartbeat.tzinfo is None:
+        heartbeat = heartbeat.replace(tzinfo=timezone.utc)
+    return heartbeat < datetime.now(timezone.utc) - CAMPAIGN_STALE_AFTER
+
+@firestore.transactional
+def queue_campaign(transaction, campaign_ref):
+    """Atomically move a draft or stale campaign to queued; False if it is missing or already in hand"""
+    campaign_doc = campaign_ref.get(transaction=transaction)
+    if not campaign_doc.exists:
+        return False
+    campaign = campaign_doc.to_dict()
+    if campaign.get('status') != 'draft' and not campaign_is_stale(campaign):
+        return False
+    transaction.update(campaign_ref, {
+        'status': 'queued',
+        'queued_at': firestore.SERVER_TIMESTAMP,
+        'heartbeat_at': firestore.SERVER_TIMESTAMP
+    })
+    return True
+
+# Firestore rejects write batches with more than 500 operations
+FIRESTORE_BATCH_LIMIT = 500
+
+def commit_in_batches(updates):
+    """Apply (doc_ref, fields) updates with as few WriteBatch commits as possible"""
+    for i in range(0, len(updates), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for doc_ref, fields in updates[i:i + FIRESTORE_BATCH_LIMIT]:
+            batch.update(doc_ref, fields)
+        batch.commit()
+
+def run_campaign(campaign_id):
+    """Send a queued campaign to all pending users and record the results
+    Recipients are marked contacted as delivery progresses, so a send that dies part way
+    can be queued again once stale without mailing them twice
+    """
+    campaign_ref = db.collection('email_campaigns').document(campaign_id)
+    
+    def update_campaign(fields):
+        campaign_ref.update(fields)
+        invalidate_query_cache('campaigns:all')
+    
+    try:
+        campaign_data = campaign_ref.get().to_dict()
+        subject = campaign_data['subject']
+        content = campaign_data['content']
+        # A resumed campaign keeps counting from what the earlier attempt delivered
+        already_sent = campaign_data.get('recipients_count') or 0
+        
+        # Stream pending users straight into the sender
+        users_ref = db.collection('waitlist_users')
+        pending_users_docs = users_ref.select(RECIPIENT_FIELDS).where(filter=FieldFilter('status', '==', 'pending')).stream()
+        
+        first_doc = next(pending_users_docs, None)
+        if first_doc is None:
+            logger.info("No pending users to send campaign %s to", campaign_id)
+            if already_sent:
+                update_campaign({'status': 'sent', 'sent_at': datetime.now()})
+            else:
+                # Nothing to send yet; leave the campaign available as a draft
+                update_campaign({'status': 'draft'})
+            return
+        
+        # recipients_count tracks delivered emails while sending so progress shows in the admin
+        update_campaign({'status': 'sending', 'recipients_count': already_sent, 'heartbeat_at': firestore.SERVER_TIMESTAMP})
+        
+        # Remember each recipient's references as it streams past, for the status update
+        user_refs = {}
+        
+        def pending_recipients():
+            for doc in itertools.chain([first_doc], pending_users_docs):
+                user_data = doc.to_dict()
+                user_refs.setdefault(user_data.get('email'), []).append(doc.reference)
+                yield user_data
+        
+        # Update user status to 'contacted' ONLY for users who received emails successfully
+        committed_emails = set()
+        
+        def contacted_updates(emails):
+            return [(user_ref, {'status': 'contacted'}) for email in emails for user_ref in user_refs.get(email, ())]
+        
+        def on_progress(sent, new_emails):
+            # Each stretch of deliveries is recorded with the progress heartbeat in one batch
+            commit_in_batches(contacted_updates(new_emails) + [(campaign_ref, {
+                'recipients_count': already_sent + sent,
+                'heartbeat_at': firestore.SERVER_TIMESTAMP
+            })])
+            committed_emails.update(new_emails)
+            invalidate_query_cache('dashboard:stats', 'campaigns:all')
+        
+        logger.info("Attempting to send campaign %s to pending users", campaign_id)
+        
+        # Send emails and get list of successful recipients
+        sent_count, successful_emails = send_email_campaign(subject, content, pending_recipients(), on_progress=on_progress)
+        
+        logger.info("Email campaign function returned: %s successful sends", sent_count)
+        
+        # The campaign status rides in the final batch with the remaining user updates
+        updates = contacted_updates(set(successful_emails) - committed_emails)
+        updates.append((campaign_ref, {
+            'status': 'sent' if already_sent + sent_count > 0 else 'failed',
+            'sent_at': datetime.now(),
+            'recipients_count': already_sent + sent_count  # Use actual sent count
+        }))
+        commit_in_batches(updates)
+        invalidate_query_cache('dashboard:stats', 'campaigns:all')
+        
+        logger.info("Marked %s of %s recipients contacted", len(set(successful_emails)), len(user_refs))
+        
+    except Exception as e:
+        logger.exception("Send campaign error: %s", e)
+        try:
+            update_campaign({'status': 'failed'})
+        except Exception as update_error:
+            logger.error("Error marking campaign %s as failed: %s", campaign_id, update_error)
+
 @app.route('/excelsior/send-campaign/<campaign_id>', methods=['POST'])
 @admin_required
 def send_campaign(campaign_id):
     try:
-        # Get campaign details
         campaign_ref = db.collection('email_campaigns').document(campaign_id)
-        campaign_doc = campaign_ref.get()
         
-        if not campaign_doc.exists:
-            flash('Campaign not found', 'error')
+        # Claiming the campaign first keeps a double-submit from sending it twice
+        if not queue_campaign(db.transaction(), campaign_ref):
+            flash('Campaign not found, already sent or still sending', 'error')
             return redirect(url_for('excelsior_emails'))
+        invalidate_query_cache('campaigns:all')
         
-        campaign_data = campaign_doc.to_dict()
+        campaign_executor.submit(run_campaign, campaign_id)
         
-        if campaign_data.get('status') != 'draft':
-            flash('Campaign already sent or not a draft', 'error')
-            return redirect(url_for('excelsior_emails'))
-        
-        subject = campaign_data['subject']
-        content = campaign_data['content']
-        
-        # Get all pending users
-        users_ref = db.collection('waitlist_users')
-        pending_users_docs = users_ref.where('status', '==', 'pending').get()
-        
-        recipients = []
-        for doc in pending_users_docs:
-            user_data = doc.to_dict()
-            recipients.append(user_data)
-        
-        if recipients:
-            print(f"Attempting to send campaign to {len(recipients)} recipients")
-            
-            # Send emails and get list of successful recipients
-            sent_count, successful_emails = send_email_campaign(subject, content, recipients)
-            
-            print(f"Email campaign function returned: {sent_count} successful sends")
-            print(f"Successful email addresses: {successful_emails}")
-            
-            # Update campaign status
-            campaign_ref.update({
-                'status': 'sent',
-                'sent_at': datetime.now(),
-                'recipients_count': sent_count  # Use actual sent count
-            })
-            
-            # Update user status to 'contacted' ONLY for users who received emails successfully
-            updated_users = 0
-            for doc in pending_users_docs:
-                try:
-                    user_data = doc.to_dict()
-                    user_email = user_data.get('email')
-                    
-                    # Only update status if email was sent successfully to this user
-                    if user_email in successful_emails:
-                        doc.reference.update({'status': 'contacted'})
-                        updated_users += 1
-                        print(f"Updated user {user_email} to 'contacted' status")
-                    else:
-                        print(f"Skipping status update for {user_email} - email not sent successfully")
-                        
-                except Exception as update_error:
-                    print(f"Error updating user {doc.id}: {update_error}")
-            
-            print(f"Updated {updated_users} users to 'contacted' status out of {len(recipients)} total recipients")
-            
-            if not SMTP_USERNAME or not SMTP_PASSWORD:
-                flash(f'Campaign marked as sent to {len(recipients)} recipients (Demo Mode)', 'success')
-            else:
-                if sent_count == len(recipients):
-                    flash(f'Campaign sent successfully to all {sent_count} recipients', 'success')
-                elif sent_count > 0:
-                    flash(f'Campaign partially sent: {sent_count} of {len(recipients)} emails delivered successfully', 'warning')
-                else:
-                    flash('Campaign failed: No emails were sent successfully', 'error')
+        if not SMTP_USERNAME or not SMTP_PASSWORD:
+            flash('Campaign queued for sending to all pending users (Demo Mode)', 'success')
         else:
-            flash('No pending users to send email to', 'warning')
+            flash('Campaign queued for sending to all pending users', 'success')
             
     except Exception as e:
-        print(f"Send campaign error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Send campaign error: %s", e)
         flash(f'Error sending campaign: {str(e)}', 'error')
     
     return redirect(url_for('excelsior_emails'))
@@ -718,32 +1115,10 @@ def view_campaign(campaign_id):
         campaign_data = campaign_doc.to_dict()
         campaign_data['id'] = campaign_id
         
-        # Ensure all required fields exist with defaults
-        campaign_data.setdefault('subject', 'No Subject')
-        campaign_data.setdefault('content', 'No Content')
-        campaign_data.setdefault('status', 'unknown')
-        campaign_data.setdefault('recipients_count', 0)
-        campaign_data.setdefault('created_by', 'Unknown')
-        
-        # Handle datetime fields safely
-        if 'sent_at' in campaign_data and campaign_data['sent_at']:
-            if hasattr(campaign_data['sent_at'], 'strftime'):
-                campaign_data['sent_at'] = campaign_data['sent_at'].strftime('%Y-%m-%d %H:%M')
-            else:
-                campaign_data['sent_at'] = str(campaign_data['sent_at'])[:16]
-        
-        if 'created_at' in campaign_data and campaign_data['created_at']:
-            if hasattr(campaign_data['created_at'], 'strftime'):
-                campaign_data['created_at'] = campaign_data['created_at'].strftime('%Y-%m-%d %H:%M')
-            else:
-                campaign_data['created_at'] = str(campaign_data['created_at'])[:16]
-        
         return render_template('view_campaign.html', campaign=campaign_data)
         
     except Exception as e:
-        print(f"View campaign error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("View campaign error: %s", e)
         flash(f'Error loading campaign: {str(e)}', 'error')
         return redirect(url_for('excelsior_emails'))
 
@@ -753,60 +1128,123 @@ def delete_campaign(campaign_id):
     try:
         campaign_ref = db.collection('email_campaigns').document(campaign_id)
         campaign_ref.delete()
+        invalidate_query_cache('campaigns:all')
         flash('Campaign deleted successfully', 'success')
         
     except Exception as e:
-        print(f"Delete campaign error: {e}")
+        logger.error("Delete campaign error: %s", e)
         flash('Error deleting campaign', 'error')
     
     return redirect(url_for('excelsior_emails'))
 
+def load_daily_signups():
+    """Signups by day for the last 30 days, in UTC like the stored signup_date timestamps"""
+    today = datetime.now(timezone.utc).date()
+    dates = [today - timedelta(days=29 - i) for i in range(30)]
+    
+    # Read the 30 per-day counters kept by add_waitlist_user in one batched round trip
+    snapshots = db.get_all([daily_count_ref(date) for date in dates], field_paths=['count'])
+    daily_signups = {snapshot.id: snapshot.get('count') for snapshot in snapshots if snapshot.exists}
+    
+    # Days without a counter document had no signups
+    return {
+        'dates': [date.isoformat() for date in dates],
+        'signups': [daily_signups.get(date.isoformat(), 0) for date in dates]
+    }
+
 @app.route('/api/stats')
 @admin_required
 def api_stats():
     try:
-        # Get signups by day for the last 30 days
-        users_ref = db.collection('waitlist_users')
-        thirty_days_ago = datetime.now() - timedelta(days=30)
-        
-        # Get all users and filter manually to avoid timezone comparison issues
-        all_users_docs = users_ref.get()
-        recent_users_docs = []
-        for doc in all_users_docs:
-            user_data = doc.to_dict()
-            signup_date = user_data.get('signup_date')
-            if signup_date and hasattr(signup_date, 'replace'):
-                # Convert timezone-aware datetime to naive for comparison
-                if signup_date.tzinfo is not None:
-                    signup_date = signup_date.replace(tzinfo=None)
-                if signup_date >= thirty_days_ago:
-                    recent_users_docs.append(doc)
-        
-        # Group by date
-        daily_signups = {}
-        for doc in recent_users_docs:
-            user_data = doc.to_dict()
-            signup_date = user_data.get('signup_date')
-            if isinstance(signup_date, datetime):
-                date_key = signup_date.strftime('%Y-%m-%d')
-                daily_signups[date_key] = daily_signups.get(date_key, 0) + 1
-        
-        # Fill in missing dates with 0
-        dates = []
-        signups = []
-        for i in range(30):
-            date = (datetime.now() - timedelta(days=29-i)).strftime('%Y-%m-%d')
-            dates.append(date)
-            signups.append(daily_signups.get(date, 0))
-        
-        return jsonify({
-            'dates': dates,
-            'signups': signups
-        })
+        # Shared by every admin polling the chart; a new signup drops it straight away.
+        # The encoded body is what's cached, so polls skip JSON serialization as well as Firestore.
+        body = cached_query('signups:daily', SIGNUP_CHART_TTL, lambda: app.json.dumps(load_daily_signups()))
+        return app.response_class(body, mimetype='application/json')
         
     except Exception as e:
-        print(f"API stats error: {e}")
+        logger.error("API stats error: %s", e)
         return jsonify({'error': 'Failed to load stats'}), 500
 
+def merge_waitlist_users(email, users):
+    """Combine one address's waitlist entries, keeping the earliest signup and any progress past pending"""
+    merged = {}
+    for user in users:
+        for field, value in user.items():
+            if value and not merged.get(field):
+                merged[field] = value
+    merged['email'] = email
+    for field in ('name', 'company', 'role'):
+        merged.setdefault(field, '')
+    
+    signup_dates = [user['signup_date'] for user in users if isinstance(user.get('signup_date'), datetime)]
+    if signup_dates:
+        merged['signup_date'] = min(signup_dates)
+    merged['status'] = next((user['status'] for user in users if user.get('status') not in (None, '', 'pending')), 'pending')
+    merged['notes'] = '\n'.join(dict.fromkeys(user['notes'] for user in users if user.get('notes')))
+    return merged
+
+@app.cli.command('rekey-waitlist-users')
+def rekey_waitlist_users():
+    """Move waitlist_users documents to their waitlist_doc_id() keys, merging duplicate signups"""
+    users_ref = db.collection('waitlist_users')
+    docs_by_email = defaultdict(list)
+    for doc in users_ref.stream():
+        email = ((doc.to_dict() or {}).get('email') or '').strip().lower()
+        if email:
+            docs_by_email[email].append(doc)
+    
+    writes = []
+    for email, docs in docs_by_email.items():
+        doc_id = waitlist_doc_id(email)
+        if len(docs) == 1 and docs[0].id == doc_id:
+            continue
+        writes.append((users_ref.document(doc_id), merge_waitlist_users(email, [doc.to_dict() for doc in docs])))
+        writes.extend((doc.reference, None) for doc in docs if doc.id != doc_id)
+    
+    # Safe to re-run if interrupted: leftovers are merged into the keyed document again
+    for i in range(0, len(writes), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for doc_ref, data in writes[i:i + FIRESTORE_BATCH_LIMIT]:
+            if data is None:
+                batch.delete(doc_ref)
+            else:
+                batch.set(doc_ref, data)
+        batch.commit()
+    
+    db.collection('app_meta').document('waitlist_users').set({'keyed_by_email': True})
+    invalidate_query_cache('dashboard:stats')
+    logger.info("Rekeyed %s of %s waitlist addresses", sum(data is not None for _, data in writes), len(docs_by_email))
+
+@app.cli.command('backfill-daily-counts')
+def backfill_daily_counts():
+    """Rebuild waitlist_daily_counts from the signup_date of every waitlist user"""
+    users_docs = db.collection('waitlist_users').select(['signup_date']).stream()
+    daily_signups = Counter(doc.get('signup_date').date() for doc in users_docs
+                            if isinstance(doc.get('signup_date'), datetime))
+    
+    days = sorted(daily_signups.items())
+    for i in range(0, len(days), FIRESTORE_BATCH_LIMIT):
+        batch = db.batch()
+        for day, count in days[i:i + FIRESTORE_BATCH_LIMIT]:
+            batch.set(daily_count_ref(day), {'count': count})
+        batch.commit()
+    invalidate_query_cache('signups:daily')
+    logger.info("Wrote signup counts for %s days", len(days))
+
+@app.cli.command('backfill-campaign-defaults')
+def backfill_campaign_defaults():
+    """Store CAMPAIGN_DEFAULTS on campaigns saved before every field was written"""
+    campaigns_docs = db.collection('email_campaigns').select(list(CAMPAIGN_DEFAULTS)).stream()
+    updates = []
+    for doc in campaigns_docs:
+        campaign = doc.to_dict()
+        missing = {field: value for field, value in CAMPAIGN_DEFAULTS.items() if field not in campaign}
+        if missing:
+            updates.append((doc.reference, missing))
+    
+    commit_in_batches(updates)
+    invalidate_query_cache('campaigns:all')
+    logger.info("Filled in missing fields on %s campaigns", len(updates))
+
 if __name__ == '__main__':
     app.run(debug=True, host='0.0.0.0', port=5001)
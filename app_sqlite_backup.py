@@ -1,19 +1,57 @@
-from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session, make_response
+from flask import Flask, render_template, stream_template, request, redirect, url_for, flash, jsonify, session, make_response, g, Response, stream_with_context
 from flask_login import LoginManager, UserMixin, login_user, logout_user, login_required, current_user
+from werkzeug.security import generate_password_hash, check_password_hash
 import firebase_admin
 from firebase_admin import credentials, firestore
 from datetime import datetime
+import csv
 import hashlib
+import hmac
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.generator import BytesGenerator
+from email import policy as email_policy
+import io
 import os
 import json
+import re
+import string
+import sqlite3
 import secrets
-from functools import wraps
+import tempfile
+from functools import wraps, lru_cache
+import atexit
+import queue
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+def _load_or_create_keyfile(path):
+    """Read the session signing key from path, creating it on first run"""
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            return f.read()
+    key = secrets.token_bytes(64)
+    # mkstemp creates the file 0600; the complete key is linked into place so readers never see a partial file
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(key)
+            f.flush()
+            os.fsync(f.fileno())
+        # link fails if the file exists, so concurrently booting workers agree on a single key
+        os.link(tmp_path, path)
+    except FileExistsError:
+        with open(path, 'rb') as f:
+            return f.read()
+    finally:
+        os.unlink(tmp_path)
+    return key
 
 app = Flask(__name__)
-app.secret_key = secrets.token_hex(32)
+# A stable key keeps admin sessions valid across restarts
+app.secret_key = os.environ.get('FLASK_SECRET_KEY') or _load_or_create_keyfile(os.path.join(app.root_path, '.secret_key'))
 
 # Initialize Firebase
 try:
@@ -42,8 +80,82 @@ SMTP_PASSWORD = os.getenv('SMTP_PASSWORD', '')
 FROM_EMAIL = os.getenv('FROM_EMAIL', 'noreply@pitchperfectai.com')
 FROM_NAME = os.getenv('FROM_NAME', 'PitchPerfectAI Team')
 
+SMTP_CONCURRENCY = int(os.getenv('SMTP_CONCURRENCY', '5'))
+SMTP_MAX_RETRIES = 3
+
+# SMTP reply codes after which the session is dropped and rebuilt
+SMTP_RECONNECT_CODES = (421, 450, 554)
+
+class SMTPPool:
+    """Pool of persistent, authenticated SMTP sessions reused across campaigns"""
+    def __init__(self, host, port, username, password, size):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self._idle = queue.Queue(maxsize=size)
+    
+    def _make_conn(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=30)
+        server.starttls()
+        server.login(self.username, self.password)
+        return server
+    
+    def acquire(self):
+        """Return a healthy session, reusing an idle one when possible"""
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return self._make_conn()
+            try:
+                if server.noop()[0] == 250:
+                    return server
+            except (smtplib.SMTPException, OSError):
+                pass
+            self.discard(server)
+    
+    def release(self, server):
+        try:
+            self._idle.put_nowait(server)
+        except queue.Full:
+            self.discard(server)
+    
+    def discard(self, server):
+        try:
+            server.quit()
+        except (smtplib.SMTPException, OSError):
+            server.close()
+    
+    def reconnect(self, server, attempt):
+        """Drop a broken session and open a new one after an exponential backoff"""
+        self.discard(server)
+        time.sleep(2 ** attempt)
+        return self._make_conn()
+    
+    def close_all(self):
+        while True:
+            try:
+                self.discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+_smtp_pools = {}
+
+def get_smtp_pool():
+    """Return the shared SMTP pool for the configured host/port/user"""
+    key = (SMTP_SERVER, SMTP_PORT, SMTP_USERNAME)
+    pool = _smtp_pools.get(key)
+    if pool is None:
+        pool = SMTPPool(SMTP_SERVER, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD, SMTP_CONCURRENCY)
+        _smtp_pools[key] = pool
+        atexit.register(pool.close_all)
+    return pool
+
 def send_email_campaign(subject, content, recipients):
-    """Send email campaign to list of recipients"""
+    """Send email campaign to list of recipients
+    Returns: (sent_count, sent_emails) where sent_emails lists the addresses that were delivered to
+    """
     if not SMTP_USERNAME or not SMTP_PASSWORD:
         # For development/demo - just simulate sending
         print(f"DEMO MODE: Would send email '{subject}' to {len(recipients)} recipients")
@@ -53,87 +165,168 @@ def send_email_campaign(subject, content, recipients):
             print(f"  Recipient {i+1}: {recipient[0]} ({recipient[1] or 'No name'})")
         if len(recipients) > 3:
             print(f"  ... and {len(recipients) - 3} more recipients")
-        return len(recipients)
+        return len(recipients), [r[0] for r in recipients]
     
-    sent_count = 0
+    pool = get_smtp_pool()
     
     try:
-        # Connect to SMTP server
-        server = smtplib.SMTP(SMTP_SERVER, SMTP_PORT)
-        server.starttls()
-        server.login(SMTP_USERNAME, SMTP_PASSWORD)
-        
-        for recipient in recipients:
-            try:
-                email = recipient[0]
-                name = recipient[1] or 'Valued User'
-                
-                # Create personalized content
-                company = recipient[2] if len(recipient) > 2 else ''
-                role = recipient[3] if len(recipient) > 3 else ''
-                
-                personalized_content = personalize_email_content(content, {
-                    'name': name,
-                    'email': email,
-                    'company': company,
-                    'role': role
-                })
-                
-                # Create email message
-                msg = MIMEMultipart('alternative')
-                msg['Subject'] = subject
-                msg['From'] = f"{FROM_NAME} <{FROM_EMAIL}>"
-                msg['To'] = email
-                
-                # Create HTML and plain text versions
-                html_content = f"""
-                <html>
-                <body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
-                    {personalized_content.replace(chr(10), '<br>')}
-                    <br><br>
-                    <hr style="border: none; border-top: 1px solid #eee; margin: 20px 0;">
-                    <p style="font-size: 12px; color: #666;">
-                        This email was sent to {email} because you signed up for the PitchPerfectAI waitlist.
-                        <br>If you no longer wish to receive these emails, please reply with "UNSUBSCRIBE".
-                    </p>
-                </body>
-                </html>
-                """
-                
-                plain_content = f"""
-                {personalized_content}
-                
-                ---
-                This email was sent to {email} because you signed up for the PitchPerfectAI waitlist.
-                If you no longer wish to receive these emails, please reply with "UNSUBSCRIBE".
-                """
-                
-                # Attach parts
-                msg.attach(MIMEText(plain_content, 'plain'))
-                msg.attach(MIMEText(html_content, 'html'))
-                
-                # Send email
-                server.send_message(msg)
-                sent_count += 1
-                
-            except Exception as e:
-                print(f"Failed to send email to {email}: {str(e)}")
-                continue
-        
-        server.quit()
-        
+        # Fail fast on bad SMTP settings; the session goes straight back to the pool
+        pool.release(pool.acquire())
     except Exception as e:
         print(f"SMTP connection error: {str(e)}")
         raise e
     
-    return sent_count
+    # Each worker thread keeps its own session for its whole share of the batch
+    worker = threading.local()
+    sessions = []
+    
+    def _send_one(task):
+        subject, personalize, recipient = task
+        email = recipient[0]
+        try:
+            data = build_campaign_message(subject, personalize, recipient)
+            if not hasattr(worker, 'session'):
+                worker.session = {'server': pool.acquire()}
+                sessions.append(worker.session)
+            worker.session['server'] = send_with_retry(pool, worker.session['server'], email, data)
+            return email, True
+        except Exception as e:
+            print(f"Failed to send email to {email}: {str(e)}")
+            return email, False
+    
+    # Parse the template once per campaign rather than once per recipient
+    personalize = compile_personalizer(content)
+    tasks = [(subject, personalize, r) for r in recipients]
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, min(SMTP_CONCURRENCY, len(tasks)))) as ex:
+            results = list(ex.map(_send_one, tasks))
+    finally:
+        for session in sessions:
+            pool.release(session['server'])
+    
+    sent_emails = [email for email, ok in results if ok]
+    return len(sent_emails), sent_emails
+
+def send_with_retry(pool, server, to_email, data):
+    """Send the serialized message, rebuilding the session on disconnects and transient 4xx replies
+    Returns the session that delivered the message
+    """
+    for attempt in range(SMTP_MAX_RETRIES + 1):
+        try:
+            server.sendmail(FROM_EMAIL, [to_email], data)
+            return server
+        except (smtplib.SMTPServerDisconnected, smtplib.SMTPResponseException) as e:
+            retryable = (isinstance(e, smtplib.SMTPServerDisconnected)
+                         or 400 <= e.smtp_code < 500
+                         or e.smtp_code in SMTP_RECONNECT_CODES)
+            if not retryable or attempt == SMTP_MAX_RETRIES:
+                raise
+            server = pool.reconnect(server, attempt)
+
+def build_campaign_message(subject, personalize, recipient):
+    """Build the personalized multipart message for one recipient row, serialized to bytes
+    personalize is the campaign's compile_personalizer() result
+    """
+    email = recipient[0]
+    name = recipient[1] or 'Valued User'
+    
+    # Create personalized content
+    company = recipient[2] if len(recipient) > 2 else ''
+    role = recipient[3] if len(recipient) > 3 else ''
+    
+    personalized_content = personalize({
+        'name': name,
+        'email': email,
+        'company': company,
+        'role': role
+    })
+    
+    # Create email message
+    msg = MIMEMultipart('alternative')
+    msg['Subject'] = subject
+    msg['From'] = FROM_HEADER
+    msg['To'] = email
+    
+    # Create HTML and plain text versions; only the content and footer address vary
+    html_content = (HTML_EMAIL_PREFIX + personalized_content.translate(NL_TO_BR)
+                    + HTML_EMAIL_SUFFIX.substitute(email=email))
+    plain_content = '\n' + personalized_content + PLAIN_EMAIL_SUFFIX.substitute(email=email)
+    
+    # Attach parts
+    msg.attach(MIMEText(plain_content, 'plain'))
+    msg.attach(MIMEText(html_content, 'html'))
+    
+    # Flatten once up front so retries resend the same bytes
+    buf = io.BytesIO()
+    BytesGenerator(buf, policy=email_policy.SMTP).flatten(msg)
+    return buf.getvalue()
+
+FROM_HEADER = f"{FROM_NAME} <{FROM_EMAIL}>"
+
+# Invariant email boilerplate wrapped around the personalized campaign content
+HTML_EMAIL_PREFIX = """
+<html>
+<body style="font-family: Arial, sans-serif; line-height: 1.6; color: #333;">
+    """
+
+HTML_EMAIL_SUFFIX = string.Template("""
+    <br><br>
+    <hr style="border: none; border-top: 1px solid #eee; margin: 20px 0;">
+    <p style="font-size: 12px; color: #666;">
+        This email was sent to $email because you signed up for the PitchPerfectAI waitlist.
+        <br>If you no longer wish to receive these emails, please reply with "UNSUBSCRIBE".
+    </p>
+</body>
+</html>
+""")
+
+PLAIN_EMAIL_SUFFIX = string.Template("""
+
+---
+This email was sent to $email because you signed up for the PitchPerfectAI waitlist.
+If you no longer wish to receive these emails, please reply with "UNSUBSCRIBE".
+""")
+
+NL_TO_BR = str.maketrans({'\n': '<br>'})
+
+_VAR_RE = re.compile(r'\{\{(\w+)\}\}')
+
+def compile_personalizer(content):
+    """Parse content once and return a function that fills in its {{var}} placeholders"""
+    if '{{' not in content:
+        return lambda variables: content
+    
+    # Alternating literal text / variable name segments
+    segments = _VAR_RE.split(content)
+    if len(segments) == 1:
+        return lambda variables: content
+    
+    def personalize(variables):
+        parts = segments[:]
+        for i in range(1, len(parts), 2):
+            key = parts[i]
+            # Unknown placeholders are left as written
+            parts[i] = str(variables[key] or '') if key in variables else '{{' + key + '}}'
+        return ''.join(parts)
+    return personalize
 
 def personalize_email_content(content, variables):
     """Replace variables in email content with actual values"""
-    personalized = content
-    for key, value in variables.items():
-        personalized = personalized.replace(f"{{{{{key}}}}}", value or '')
-    return personalized
+    return compile_personalizer(content)(variables)
+
+def fetch_pending_recipients(cursor):
+    """Return (email, name, company, role) rows for the users currently pending"""
+    cursor.execute('SELECT email, name, company, role FROM waitlist_users WHERE status = "pending"')
+    return cursor.fetchall()
+
+def mark_recipients_contacted(cursor, sent_emails):
+    """Mark delivered recipients as contacted, reusing one prepared statement per address
+    Callers wrap this in BEGIN IMMEDIATE/COMMIT so the whole batch is a single WAL commit
+    """
+    cursor.executemany(
+        'UPDATE waitlist_users SET status = "contacted" WHERE email = ? AND status = "pending"',
+        ((email,) for email in sent_emails)
+    )
 
 # Initialize Flask-Login
 login_manager = LoginManager()
@@ -141,10 +334,73 @@ login_manager.init_app(app)
 login_manager.login_view = 'admin_login'
 
 # Database setup
+DATABASE = 'waitlist.db'
+
+# Applied once when a connection is opened; cache_size is negative so it is in KiB (20MB)
+PRAGMAS = '''
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA cache_size=-20000;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA mmap_size=268435456;
+'''
+
+_tls = threading.local()
+
+def open_db_connection():
+    """Open a new autocommit SQLite connection with the standard PRAGMAs applied"""
+    conn = sqlite3.connect(DATABASE, timeout=30, check_same_thread=False, isolation_level=None)
+    # Rows support both index and column-name access, including from templates
+    conn.row_factory = sqlite3.Row
+    conn.executescript(PRAGMAS)
+    return conn
+
+def get_db_connection():
+    """Return this thread's long-lived SQLite connection, opening it on first use"""
+    if not hasattr(_tls, 'conn'):
+        _tls.conn = open_db_connection()
+    return _tls.conn
+
+def execute_write(sql, params=()):
+    """Run one write statement in its own BEGIN IMMEDIATE transaction
+    WAL lets readers proceed meanwhile; SQLite's busy timeout queues competing
+    writers, and a write that still finds the database locked is retried once.
+    """
+    conn = get_db_connection()
+    for attempt in range(2):
+        try:
+            conn.execute('BEGIN IMMEDIATE')
+            break
+        except sqlite3.OperationalError:
+            if attempt:
+                raise
+    try:
+        cursor = conn.execute(sql, params)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+    return cursor
+
+def get_request_connection():
+    """Return a connection owned by the current request, for cursors consumed by streamed templates"""
+    if 'request_conn' not in g:
+        g.request_conn = open_db_connection()
+    return g.request_conn
+
+@app.teardown_request
+def close_request_connection(exc):
+    conn = g.pop('request_conn', None)
+    if conn is not None:
+        conn.close()
+
 def init_db():
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    # CREATE ... IF NOT EXISTS and INSERT OR IGNORE are idempotent, so no lock is needed
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    # Create schema and seed data in a single transaction
+    cursor.execute('BEGIN')
     
     # Create waitlist users table
     cursor.execute('''
@@ -183,15 +439,19 @@ def init_db():
         )
     ''')
     
+    # Indexes for the status filters and signup_date ordering used by the admin pages.
+    # idx_waitlist_status_email covers the recipient query so it never touches the table.
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_waitlist_status ON waitlist_users(status)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_waitlist_signup ON waitlist_users(signup_date DESC)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_waitlist_status_email ON waitlist_users(status, email, name, company, role)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_campaigns_status ON email_campaigns(status)')
+    
     # Create default admin user if none exists
-    cursor.execute('SELECT COUNT(*) FROM admin_users')
-    if cursor.fetchone()[0] == 0:
-        password_hash = hashlib.sha256('admin123'.encode()).hexdigest()
-        cursor.execute('INSERT INTO admin_users (username, password_hash) VALUES (?, ?)', 
-                      ('admin', password_hash))
+    cursor.execute('INSERT INTO admin_users (username, password_hash) SELECT ?, ? '
+                   'WHERE NOT EXISTS (SELECT 1 FROM admin_users)',
+                   ('admin', generate_password_hash('admin123', method='scrypt')))
     
-    conn.commit()
-    conn.close()
+    cursor.execute('COMMIT')
 
 class User:
     def __init__(self, id, username):
@@ -204,19 +464,70 @@ class User:
     def get_id(self):
         return str(self.id)
 
+@lru_cache(maxsize=64)
+def get_admin(user_id):
+    """Return (id, username) for an admin id; admin rows never change at runtime"""
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, username FROM admin_users WHERE id = ?', (user_id,))
+    return cursor.fetchone()
+
 @login_manager.user_loader
 def load_user(user_id):
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('SELECT id, username FROM admin_users WHERE id = ?', (user_id,))
-        user_data = cursor.fetchone()
-        conn.close()
+    user_data = get_admin(user_id)
     
     if user_data:
         return User(user_data[0], user_data[1])
     return None
 
+VERIFIER_CACHE_TTL = 300
+VERIFIER_CACHE_SIZE = 64
+
+# Per-process salt for the cached password digests, so they can't be matched against precomputed hashes
+_verifier_salt = secrets.token_bytes(16)
+
+# username -> (expires_at, password digest, (id, username)) for recent successful logins
+_verifier_cache = {}
+
+def _password_digest(password):
+    return hmac.new(_verifier_salt, password.encode(), hashlib.sha256).digest()
+
+def invalidate_verifier_cache(username):
+    """Forget a cached login; call whenever the user's password_hash is rewritten"""
+    _verifier_cache.pop(username, None)
+
+def verify_admin(username, password):
+    """Return (id, username) if the credentials are valid, otherwise None"""
+    digest = _password_digest(password)
+    now = time.time()
+    cached = _verifier_cache.get(username)
+    if cached and cached[0] > now and hmac.compare_digest(cached[1], digest):
+        return cached[2]
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    cursor.execute('SELECT id, username, password_hash FROM admin_users WHERE username = ?', (username,))
+    row = cursor.fetchone()
+    if not row:
+        return None
+    
+    user_id, name, password_hash = row
+    if '$' in password_hash:
+        if not check_password_hash(password_hash, password):
+            return None
+    else:
+        # Legacy unsalted SHA-256 hash - upgrade it to scrypt on successful login
+        if not hmac.compare_digest(password_hash, hashlib.sha256(password.encode()).hexdigest()):
+            return None
+        execute_write('UPDATE admin_users SET password_hash = ? WHERE id = ?',
+                      (generate_password_hash(password, method='scrypt'), user_id))
+        invalidate_verifier_cache(name)
+    
+    if len(_verifier_cache) >= VERIFIER_CACHE_SIZE and name not in _verifier_cache:
+        _verifier_cache.pop(next(iter(_verifier_cache)))
+    _verifier_cache[name] = (now + VERIFIER_CACHE_TTL, digest, (user_id, name))
+    return user_id, name
+
 def admin_required(f):
     @wraps(f)
     def decorated_function(*args, **kwargs):
@@ -225,6 +536,15 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+STATS_TTL = 60
+
+# (computed_at, payload) for api_stats; cleared when someone joins the waitlist
+_stats_cache = (0, None)
+
+def invalidate_stats_cache():
+    global _stats_cache
+    _stats_cache = (0, None)
+
 # Routes
 @app.route('/')
 def landing():
@@ -242,16 +562,12 @@ def join_waitlist():
         return redirect(url_for('landing'))
     
     try:
-        with db_lock:
-            conn = get_db_connection()
-            cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO waitlist_users (email, name, company, role) 
-                VALUES (?, ?, ?, ?)
-            ''', (email, name, company, role))
-            conn.commit()
-            conn.close()
+        execute_write('''
+            INSERT INTO waitlist_users (email, name, company, role) 
+            VALUES (?, ?, ?, ?)
+        ''', (email, name, company, role))
         
+        invalidate_stats_cache()
         flash('Successfully joined the waitlist! We\'ll be in touch soon.', 'success')
     except sqlite3.IntegrityError:
         flash('This email is already on our waitlist!', 'info')
@@ -267,15 +583,7 @@ def admin_login():
         password = request.form.get('password')
         
         if username and password:
-            password_hash = hashlib.sha256(password.encode()).hexdigest()
-            
-            with db_lock:
-                conn = get_db_connection()
-                cursor = conn.cursor()
-                cursor.execute('SELECT id, username FROM admin_users WHERE username = ? AND password_hash = ?', 
-                              (username, password_hash))
-                user_data = cursor.fetchone()
-                conn.close()
+            user_data = verify_admin(username, password)
             
             if user_data:
                 user = User(user_data[0], user_data[1])
@@ -295,19 +603,16 @@ def admin_logout():
 @app.route('/admin')
 @admin_required
 def admin_dashboard():
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-    
-    # Get waitlist statistics
-    cursor.execute('SELECT COUNT(*) FROM waitlist_users')
-    total_users = cursor.fetchone()[0]
-    
-    cursor.execute('SELECT COUNT(*) FROM waitlist_users WHERE status = "pending"')
-    pending_users = cursor.fetchone()[0]
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
-    cursor.execute('SELECT COUNT(*) FROM email_campaigns WHERE status = "sent"')
-    sent_campaigns = cursor.fetchone()[0]
+    # Get waitlist statistics in a single round-trip
+    cursor.execute('''
+        SELECT (SELECT COUNT(*) FROM waitlist_users),
+               (SELECT COUNT(*) FROM waitlist_users WHERE status = 'pending'),
+               (SELECT COUNT(*) FROM email_campaigns WHERE status = 'sent')
+    ''')
+    total_users, pending_users, sent_campaigns = cursor.fetchone()
     
     # Get recent signups
     cursor.execute('''
@@ -316,21 +621,7 @@ def admin_dashboard():
         ORDER BY signup_date DESC 
         LIMIT 10
     ''')
-    recent_users_raw = cursor.fetchall()
-    
-    # Convert tuples to dictionaries for template access
-    recent_users = []
-    for user in recent_users_raw:
-        recent_users.append({
-            'email': user[0],
-            'name': user[1],
-            'company': user[2],
-            'role': user[3],
-            'signup_date': user[4],
-            'status': user[5]
-        })
-    
-    conn.close()
+    recent_users = cursor.fetchall()
     
     return render_template('admin_dashboard.html', 
                          total_users=total_users,
@@ -341,18 +632,16 @@ def admin_dashboard():
 @app.route('/admin/users')
 @admin_required
 def admin_users():
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    conn = get_request_connection()
+    cursor = conn.cursor()
     cursor.execute('''
         SELECT id, email, name, company, role, signup_date, status, notes 
         FROM waitlist_users 
         ORDER BY signup_date DESC
     ''')
-    users = cursor.fetchall()
-    conn.close()
     
-    return render_template('admin_users.html', users=users)
+    # Rows are pulled from the cursor as the template renders
+    return stream_template('admin_users.html', users=cursor)
 
 @app.route('/admin/users/update', methods=['POST'])
 @admin_required
@@ -361,13 +650,8 @@ def update_user_status():
     status = request.form.get('status')
     notes = request.form.get('notes', '')
     
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        cursor.execute('UPDATE waitlist_users SET status = ?, notes = ? WHERE id = ?', 
-                      (status, notes, user_id))
-        conn.commit()
-        conn.close()
+    execute_write('UPDATE waitlist_users SET status = ?, notes = ? WHERE id = ?', 
+                  (status, notes, user_id))
     
     flash('User updated successfully', 'success')
     return redirect(url_for('admin_users'))
@@ -375,16 +659,14 @@ def update_user_status():
 @app.route('/admin/emails')
 @admin_required
 def admin_emails():
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    conn = get_db_connection()
+    cursor = conn.cursor()
     cursor.execute('''
         SELECT id, subject, recipients_count, sent_at, created_by, status 
         FROM email_campaigns 
         ORDER BY id DESC
     ''')
     campaigns = cursor.fetchall()
-    conn.close()
     
     return render_template('admin_emails.html', campaigns=campaigns)
 
@@ -400,9 +682,8 @@ def new_email():
             flash('Subject and content are required', 'error')
             return render_template('new_email.html')
         
-        with db_lock:
-            conn = get_db_connection()
-            cursor = conn.cursor()
+        conn = get_db_connection()
+        cursor = conn.cursor()
         
         if action == 'save_draft':
             cursor.execute('''
@@ -413,74 +694,79 @@ def new_email():
         
         elif action == 'send_now':
             # Get all pending users with more details for personalization
-            cursor.execute('SELECT email, name, company, role FROM waitlist_users WHERE status = "pending"')
-            recipients = cursor.fetchall()
+            recipients = fetch_pending_recipients(cursor)
             
             if recipients:
-                # Save campaign
-                cursor.execute('''
-                    INSERT INTO email_campaigns (subject, content, recipients_count, sent_at, created_by, status) 
-                    VALUES (?, ?, ?, ?, ?, 'sent')
-                ''', (subject, content, len(recipients), datetime.now(), current_user.username))
-                
-                # Send actual emails
+                # Send actual emails before taking the write lock
                 try:
-                    sent_count = send_email_campaign(subject, content, recipients)
+                    sent_count, sent_emails = send_email_campaign(subject, content, recipients)
+                    status = 'sent'
                     flash(f'Email sent to {sent_count} recipients', 'success')
-                    
-                    # Update user status to 'contacted' after successful email
-                    recipient_emails = [r[0] for r in recipients]
-                    placeholders = ','.join(['?' for _ in recipient_emails])
-                    cursor.execute(f'UPDATE waitlist_users SET status = "contacted" WHERE email IN ({placeholders})', recipient_emails)
-                    
                 except Exception as e:
+                    status = 'failed'
                     flash(f'Error sending emails: {str(e)}', 'error')
-                    # Update campaign status to failed
-                    cursor.execute('UPDATE email_campaigns SET status = "failed" WHERE id = last_insert_rowid()')
+                
+                # Save campaign and recipient statuses as one transaction
+                cursor.execute('BEGIN IMMEDIATE')
+                try:
+                    cursor.execute('''
+                        INSERT INTO email_campaigns (subject, content, recipients_count, sent_at, created_by, status) 
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    ''', (subject, content, len(recipients), datetime.now(), current_user.username, status))
+                    
+                    # Update user status to 'contacted' after successful email
+                    if status == 'sent':
+                        mark_recipients_contacted(cursor, sent_emails)
+                    cursor.execute('COMMIT')
+                except Exception:
+                    cursor.execute('ROLLBACK')
+                    raise
             else:
                 flash('No pending users to send email to', 'warning')
         
-        conn.commit()
-        conn.close()
-        
         return redirect(url_for('admin_emails'))
     
     return render_template('new_email.html')
 
+# Rows fetched and formatted per chunk of the CSV export
+EXPORT_BATCH_SIZE = 10000
+
 @app.route('/admin/export')
 @admin_required
 def export_users():
-    from flask import Response
-    import csv
-    import io
-    
-    conn = sqlite3.connect('waitlist.db')
-    cursor = conn.cursor()
-    cursor.execute('''
-        SELECT email, name, company, role, signup_date, status, notes 
-        FROM waitlist_users 
-        ORDER BY signup_date DESC
-    ''')
-    users = cursor.fetchall()
-    conn.close()
-    
-    # Create CSV in memory
-    output = io.StringIO()
-    writer = csv.writer(output)
-    
-    # Write header
-    writer.writerow(['Email', 'Name', 'Company', 'Role', 'Signup Date', 'Status', 'Notes'])
-    
-    # Write data
-    for user in users:
-        writer.writerow(user)
-    
-    # Create response
-    csv_data = output.getvalue()
-    output.close()
+    def generate():
+        # The generator owns its connection so the cursor stays valid while rows stream out
+        conn = open_db_connection()
+        try:
+            cursor = conn.cursor()
+            cursor.arraysize = EXPORT_BATCH_SIZE
+            cursor.execute('''
+                SELECT email, name, company, role, signup_date, status, notes 
+                FROM waitlist_users 
+                ORDER BY signup_date DESC
+            ''')
+            
+            output = io.StringIO()
+            writer = csv.writer(output)
+            
+            # Write header
+            writer.writerow(['Email', 'Name', 'Company', 'Role', 'Signup Date', 'Status', 'Notes'])
+            rows = cursor.fetchmany()
+            
+            # Write data one batch of rows at a time
+            while True:
+                writer.writerows(rows)
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+                rows = cursor.fetchmany()
+                if not rows:
+                    break
+        finally:
+            conn.close()
     
     response = Response(
-        csv_data,
+        stream_with_context(generate()),
         mimetype='text/csv',
         headers={'Content-Disposition': 'attachment; filename=waitlist_users.csv'}
     )
@@ -510,7 +796,7 @@ If you receive this email, the SMTP settings are properly configured!
 Best regards,
 The PitchPerfectAI Team"""
         
-        sent_count = send_email_campaign(subject, content, test_recipients)
+        sent_count, sent_emails = send_email_campaign(subject, content, test_recipients)
         flash(f'Test email sent successfully to {test_email_addr}', 'success')
         
     except Exception as e:
@@ -528,50 +814,57 @@ def send_draft_campaign():
         flash('Invalid campaign ID', 'error')
         return redirect(url_for('admin_emails'))
     
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    try:
+        # Claim the draft before any mail goes out, so a double submit can't send it twice
+        claim = execute_write('UPDATE email_campaigns SET status = "sending" WHERE id = ? AND status = "draft"', (campaign_id,))
+        if claim.rowcount == 0:
+            flash('Campaign not found or already sent', 'error')
+            return redirect(url_for('admin_emails'))
         
-        try:
-            # Get campaign details
-            cursor.execute('SELECT subject, content FROM email_campaigns WHERE id = ? AND status = "draft"', (campaign_id,))
-            campaign = cursor.fetchone()
-            
-            if not campaign:
-                flash('Campaign not found or already sent', 'error')
-                return redirect(url_for('admin_emails'))
-            
-            subject, content = campaign
-            
-            # Get all pending users
-            cursor.execute('SELECT email, name, company, role FROM waitlist_users WHERE status = "pending"')
-            recipients = cursor.fetchall()
+        # Get campaign details
+        cursor.execute('SELECT subject, content FROM email_campaigns WHERE id = ?', (campaign_id,))
+        subject, content = cursor.fetchone()
+        
+        # Get all pending users
+        recipients = fetch_pending_recipients(cursor)
+        
+        if recipients:
+            # Send emails
+            try:
+                sent_count, sent_emails = send_email_campaign(subject, content, recipients)
+            except Exception:
+                # Nothing went out; release the claim so the draft can be sent again
+                execute_write('UPDATE email_campaigns SET status = "draft" WHERE id = ? AND status = "sending"', (campaign_id,))
+                raise
             
-            if recipients:
-                # Send emails
-                sent_count = send_email_campaign(subject, content, recipients)
-                
+            # Commit campaign and recipient statuses together
+            cursor.execute('BEGIN IMMEDIATE')
+            try:
                 # Update campaign status
                 cursor.execute('''
                     UPDATE email_campaigns 
                     SET status = "sent", sent_at = ?, recipients_count = ? 
-                    WHERE id = ?
+                    WHERE id = ? AND status = "sending"
                 ''', (datetime.now(), sent_count, campaign_id))
                 
                 # Update user status to 'contacted'
-                recipient_emails = [r[0] for r in recipients]
-                placeholders = ','.join(['?' for _ in recipient_emails])
-                cursor.execute(f'UPDATE waitlist_users SET status = "contacted" WHERE email IN ({placeholders})', recipient_emails)
-                
-                flash(f'Campaign sent to {sent_count} recipients', 'success')
-            else:
-                flash('No pending users to send email to', 'warning')
-                
-        except Exception as e:
-            flash(f'Error sending campaign: {str(e)}', 'error')
-        
-        conn.commit()
-        conn.close()
+                mark_recipients_contacted(cursor, sent_emails)
+                cursor.execute('COMMIT')
+            except Exception:
+                cursor.execute('ROLLBACK')
+                raise
+            
+            flash(f'Campaign sent to {sent_count} recipients', 'success')
+        else:
+            # Nothing was sent; leave the campaign available as a draft
+            execute_write('UPDATE email_campaigns SET status = "draft" WHERE id = ?', (campaign_id,))
+            flash('No pending users to send email to', 'warning')
+            
+    except Exception as e:
+        flash(f'Error sending campaign: {str(e)}', 'error')
     
     return redirect(url_for('admin_emails'))
 
@@ -579,75 +872,63 @@ def send_draft_campaign():
 @admin_required
 def view_campaign(campaign_id):
     """View campaign details"""
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute('SELECT id, subject, content, recipients_count, sent_at, created_by, status FROM email_campaigns WHERE id = ?', (campaign_id,))
-        campaign = cursor.fetchone()
-        conn.close()
+    conn = get_db_connection()
+    cursor = conn.cursor()
+    
+    cursor.execute('SELECT id, subject, content, recipients_count, sent_at, created_by, status FROM email_campaigns WHERE id = ?', (campaign_id,))
+    campaign = cursor.fetchone()
     
     if not campaign:
         flash('Campaign not found', 'error')
         return redirect(url_for('admin_emails'))
     
-    campaign_data = {
-        'id': campaign[0],
-        'subject': campaign[1],
-        'content': campaign[2],
-        'recipients_count': campaign[3],
-        'sent_at': campaign[4],
-        'created_by': campaign[5],
-        'status': campaign[6]
-    }
-    
-    return render_template('view_campaign.html', campaign=campaign_data)
+    return render_template('view_campaign.html', campaign=campaign)
 
 @app.route('/admin/delete-campaign/<int:campaign_id>', methods=['POST'])
 @admin_required
 def delete_campaign(campaign_id):
     """Delete a campaign"""
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
+    try:
+        cursor = execute_write('DELETE FROM email_campaigns WHERE id = ?', (campaign_id,))
         
-        try:
-            cursor.execute('DELETE FROM email_campaigns WHERE id = ?', (campaign_id,))
-            conn.commit()
+        if cursor.rowcount > 0:
+            flash('Campaign deleted successfully', 'success')
+        else:
+            flash('Campaign not found', 'error')
             
-            if cursor.rowcount > 0:
-                flash('Campaign deleted successfully', 'success')
-            else:
-                flash('Campaign not found', 'error')
-                
-        except Exception as e:
-            flash(f'Error deleting campaign: {str(e)}', 'error')
-        
-        conn.close()
+    except Exception as e:
+        flash(f'Error deleting campaign: {str(e)}', 'error')
+    
     return redirect(url_for('admin_emails'))
 
 @app.route('/api/stats')
 @admin_required
 def api_stats():
-    with db_lock:
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # Get signups by day for the last 30 days
-        cursor.execute('''
-            SELECT DATE(signup_date) as date, COUNT(*) as count 
-            FROM waitlist_users 
-            WHERE signup_date >= date('now', '-30 days')
-            GROUP BY DATE(signup_date)
-            ORDER BY date
-        ''')
-        daily_signups = cursor.fetchall()
-        
-        conn.close()
+    global _stats_cache
+    now = time.monotonic()
+    computed_at, payload = _stats_cache
+    if payload and now - computed_at < STATS_TTL:
+        return jsonify(payload)
+    
+    conn = get_db_connection()
+    cursor = conn.cursor()
     
-    return jsonify({
+    # Get signups by day for the last 30 days; signup_date is stored as
+    # 'YYYY-MM-DD HH:MM:SS' so its first 10 characters are the day
+    cursor.execute('''
+        SELECT substr(signup_date, 1, 10) as date, COUNT(*) as count 
+        FROM waitlist_users 
+        WHERE signup_date >= date('now', '-30 days')
+        GROUP BY date
+        ORDER BY date
+    ''')
+    daily_signups = cursor.fetchall()
+    
+    payload = {
         'daily_signups': [{'date': row[0], 'count': row[1]} for row in daily_signups]
-    })
+    }
+    _stats_cache = (now, payload)
+    return jsonify(payload)
 
 if __name__ == '__main__':
     init_db()